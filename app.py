@@ -2,96 +2,265 @@
 ParoCyberBank – Demo bank application (Python + SQLite).
 Run: pip install -r requirements.txt && python app.py
 """
+import json
+import math
 import os
+import secrets
+import shutil
 import sqlite3
-from datetime import datetime
-from functools import wraps
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import cache, wraps
+from urllib.parse import quote
+import click
 from flask import Flask, request, jsonify, session, render_template, redirect, url_for
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+from werkzeug.datastructures import CallbackDict
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-change-in-prod")
-DATABASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parocyberbank.db")
+DATABASE = os.environ.get("DATABASE_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "parocyberbank.db")
+SEED_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".seed-snapshot.db")
+JINJA_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jinja-cache")
+RENDER_CACHE_SIZE = 2048
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(8 * 3600)))
+SESSION_CACHE_SIZE = 10000
+SESSION_CACHE_REVALIDATE_SECONDS = 5
+SESSION_CLEANUP_INTERVAL = 60
+SESSION_CLEANUP_BATCH = 1000
+# Archives belong to one database, so they live next to it unless ARCHIVE_DIR says otherwise.
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR") or os.path.splitext(os.path.abspath(DATABASE))[0] + "-archive"
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "365"))
+
+SCHEDULER_BATCH_SIZE = 500
+SCHEDULER_POLL_SECONDS = 1.0
+SCHEDULER_MAX_ATTEMPTS = 3
+SCHEDULER_RETRY_SECONDS = 60
+SCHEDULER_MIN_INTERVAL = 60
+SCHEDULER_MAX_INTERVAL = 366 * 86400
+SCHEDULER_MAX_HORIZON = 10 * 366 * 86400
+SCHEDULER_MAX_AMOUNT_CENTS = 10**12
+
+# Compiled templates persist across restarts; Jinja checks the source checksum on load.
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_options = {**app.jinja_options, "bytecode_cache": FileSystemBytecodeCache(JINJA_CACHE_DIR)}
 
 
 def get_db():
-    conn = sqlite3.connect(DATABASE)
+    conn = sqlite3.connect(DATABASE, uri=True)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        full_name TEXT NOT NULL,
+        email TEXT
+    );
+    CREATE TABLE IF NOT EXISTS accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        account_number TEXT UNIQUE NOT NULL,
+        name TEXT NOT NULL,
+        balance_cents INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    );
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        from_account_id INTEGER NOT NULL,
+        to_account_id INTEGER NOT NULL,
+        amount_cents INTEGER NOT NULL,
+        memo TEXT,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (from_account_id) REFERENCES accounts(id),
+        FOREIGN KEY (to_account_id) REFERENCES accounts(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_transactions_from ON transactions (from_account_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_transactions_to ON transactions (to_account_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_transactions_created_at ON transactions (created_at);
+    CREATE TABLE IF NOT EXISTS transaction_archives (
+        month TEXT PRIMARY KEY,
+        filename TEXT NOT NULL,
+        archived_through TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS transaction_archive_accounts (
+        account_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        PRIMARY KEY (account_id, month)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS user_data_versions (
+        user_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_insert_version AFTER INSERT ON accounts BEGIN
+        INSERT INTO user_data_versions (user_id, version) VALUES (NEW.user_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_update_version AFTER UPDATE ON accounts BEGIN
+        INSERT INTO user_data_versions (user_id, version)
+        SELECT user_id, 1 FROM (SELECT OLD.user_id AS user_id UNION SELECT NEW.user_id) WHERE true
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_delete_version AFTER DELETE ON accounts BEGIN
+        INSERT INTO user_data_versions (user_id, version) VALUES (OLD.user_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_insert_version AFTER INSERT ON transactions BEGIN
+        INSERT INTO user_data_versions (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM accounts WHERE id IN (NEW.from_account_id, NEW.to_account_id)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_update_version AFTER UPDATE ON transactions BEGIN
+        INSERT INTO user_data_versions (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM accounts
+        WHERE id IN (OLD.from_account_id, OLD.to_account_id, NEW.from_account_id, NEW.to_account_id)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_delete_version AFTER DELETE ON transactions BEGIN
+        INSERT INTO user_data_versions (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM accounts WHERE id IN (OLD.from_account_id, OLD.to_account_id)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    END;
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER,
+        data TEXT NOT NULL,
+        expires_at INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id);
+    CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at);
+    CREATE TABLE IF NOT EXISTS saved_payees (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        payee_user_id INTEGER NOT NULL,
+        label TEXT NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(id),
+        FOREIGN KEY (payee_user_id) REFERENCES users(id),
+        UNIQUE(user_id, payee_user_id)
+    );
+    CREATE TABLE IF NOT EXISTS scheduled_transfers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        from_account_id INTEGER NOT NULL,
+        to_account_id INTEGER NOT NULL,
+        amount_cents INTEGER NOT NULL,
+        memo TEXT,
+        interval_seconds INTEGER,
+        due_at INTEGER NOT NULL,
+        next_run_at INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'active',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        last_run_at INTEGER,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(id),
+        FOREIGN KEY (from_account_id) REFERENCES accounts(id),
+        FOREIGN KEY (to_account_id) REFERENCES accounts(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_scheduled_transfers_due
+        ON scheduled_transfers (next_run_at) WHERE status = 'active';
+    CREATE TABLE IF NOT EXISTS scheduled_transfer_failures (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scheduled_transfer_id INTEGER NOT NULL,
+        attempt INTEGER NOT NULL,
+        error TEXT NOT NULL,
+        failed_at INTEGER NOT NULL,
+        retry_at INTEGER,
+        FOREIGN KEY (scheduled_transfer_id) REFERENCES scheduled_transfers(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_scheduled_transfer_failures_st
+        ON scheduled_transfer_failures (scheduled_transfer_id);
+"""
+
+SEED_USERS = [
+    ("alice", "alice123", "Alice Smith", "alice@example.com"),
+    ("bob", "bob456", "Bob Jones", "bob@example.com"),
+    ("charlie", "charlie789", "Charlie Admin", "charlie@bank.local"),
+]
+SEED_ACCOUNTS = [
+    (1, "400012340001", "Main Checking", 150000),
+    (2, "400012340002", "Main Checking", 75000),
+    (3, "400012340003", "Main Checking", 500000),
+    (3, "400012340004", "Savings", 1000000),
+]
+SEED_TRANSACTIONS = [
+    (1, 2, 2500, "Coffee"),
+    (2, 1, 10000, "Rent share"),
+]
+
+# Stamped into PRAGMA user_version; changes whenever the schema or seed data does.
+SCHEMA_VERSION = zlib.crc32(repr((SCHEMA, SEED_USERS, SEED_ACCOUNTS, SEED_TRANSACTIONS)).encode()) & 0x7FFFFFFF
+
+
+def bootstrap_db(conn):
+    """Create missing tables, seed an empty database and stamp SCHEMA_VERSION."""
+    conn.executescript("BEGIN;" + SCHEMA + "COMMIT;")
+    index_archive_accounts(conn)
+    if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+        now = datetime.utcnow().isoformat() + "Z"
+        conn.executemany("INSERT INTO users (username, password, full_name, email) VALUES (?, ?, ?, ?)", SEED_USERS)
+        conn.executemany("INSERT INTO accounts (user_id, account_number, name, balance_cents) VALUES (?, ?, ?, ?)", SEED_ACCOUNTS)
+        conn.executemany(
+            "INSERT INTO transactions (from_account_id, to_account_id, amount_cents, memo, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(*t, now) for t in SEED_TRANSACTIONS],
+        )
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+
+def schema_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def build_seed_snapshot():
+    """Return SEED_SNAPSHOT, rebuilding it if it was made for another SCHEMA_VERSION."""
+    if os.path.exists(SEED_SNAPSHOT) and schema_version(SEED_SNAPSHOT) == SCHEMA_VERSION:
+        return SEED_SNAPSHOT
+    tmp = f"{SEED_SNAPSHOT}.{os.getpid()}.tmp"
+    conn = sqlite3.connect(tmp)
+    try:
+        bootstrap_db(conn)
+    finally:
+        conn.close()
+    os.replace(tmp, SEED_SNAPSHOT)
+    return SEED_SNAPSHOT
+
+
 def init_db():
-    with get_db() as conn:
-        conn.executescript("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                full_name TEXT NOT NULL,
-                email TEXT
-            );
-            CREATE TABLE IF NOT EXISTS accounts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                account_number TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                balance_cents INTEGER NOT NULL DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            );
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                from_account_id INTEGER NOT NULL,
-                to_account_id INTEGER NOT NULL,
-                amount_cents INTEGER NOT NULL,
-                memo TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (from_account_id) REFERENCES accounts(id),
-                FOREIGN KEY (to_account_id) REFERENCES accounts(id)
-            );
-            CREATE TABLE IF NOT EXISTS saved_payees (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                payee_user_id INTEGER NOT NULL,
-                label TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(id),
-                FOREIGN KEY (payee_user_id) REFERENCES users(id),
-                UNIQUE(user_id, payee_user_id)
-            );
-        """)
-        cur = conn.execute("SELECT COUNT(*) FROM users")
-        if cur.fetchone()[0] == 0:
-            conn.execute(
-                "INSERT INTO users (username, password, full_name, email) VALUES (?, ?, ?, ?)",
-                ("alice", "alice123", "Alice Smith", "alice@example.com"),
-            )
-            conn.execute(
-                "INSERT INTO users (username, password, full_name, email) VALUES (?, ?, ?, ?)",
-                ("bob", "bob456", "Bob Jones", "bob@example.com"),
-            )
-            conn.execute(
-                "INSERT INTO users (username, password, full_name, email) VALUES (?, ?, ?, ?)",
-                ("charlie", "charlie789", "Charlie Admin", "charlie@bank.local"),
-            )
-            conn.execute(
-                "INSERT INTO accounts (user_id, account_number, name, balance_cents) VALUES (1, '400012340001', 'Main Checking', 150000)",
-            )
-            conn.execute(
-                "INSERT INTO accounts (user_id, account_number, name, balance_cents) VALUES (2, '400012340002', 'Main Checking', 75000)",
-            )
-            conn.execute(
-                "INSERT INTO accounts (user_id, account_number, name, balance_cents) VALUES (3, '400012340003', 'Main Checking', 500000)",
-            )
-            conn.execute(
-                "INSERT INTO accounts (user_id, account_number, name, balance_cents) VALUES (3, '400012340004', 'Savings', 1000000)",
-            )
-            now = datetime.utcnow().isoformat() + "Z"
-            conn.execute(
-                "INSERT INTO transactions (from_account_id, to_account_id, amount_cents, memo, created_at) VALUES (1, 2, 2500, 'Coffee', ?)",
-                (now,),
-            )
-            conn.execute(
-                "INSERT INTO transactions (from_account_id, to_account_id, amount_cents, memo, created_at) VALUES (2, 1, 10000, 'Rent share', ?)",
-                (now,),
-            )
+    """Make DATABASE ready to serve.
+
+    A database already at SCHEMA_VERSION costs one PRAGMA read. A missing one is
+    copied from the seed snapshot instead of replaying the DDL and INSERTs.
+    """
+    if os.path.exists(DATABASE):
+        if schema_version(DATABASE) != SCHEMA_VERSION:
+            conn = sqlite3.connect(DATABASE, uri=True)
+            try:
+                bootstrap_db(conn)
+            finally:
+                conn.close()
+        return
+
+    tmp = f"{DATABASE}.{os.getpid()}.tmp"
+    shutil.copyfile(build_seed_snapshot(), tmp)
+    conn = sqlite3.connect(tmp)
+    conn.execute("UPDATE transactions SET created_at = ?", (datetime.utcnow().isoformat() + "Z",))
+    conn.commit()
+    conn.close()
+    os.replace(tmp, DATABASE)
 
 
 def login_required(f):
@@ -105,31 +274,572 @@ def login_required(f):
     return wrapped
 
 
+CENTS_SUFFIX = tuple(f".{c:02d}" for c in range(100))
+
+
+def format_cents(cents):
+    """Same text as f"{cents / 100:.2f}", without the float round-trip."""
+    if cents < 0:
+        return "-" + format_cents(-cents)
+    dollars, rem = divmod(cents, 100)
+    return str(dollars) + CENTS_SUFFIX[rem]
+
+
 def row_to_account(r):
     return {
         "id": r["id"],
         "account_number": r["account_number"],
         "name": r["name"],
         "balance_cents": r["balance_cents"],
-        "balance": f"{r['balance_cents'] / 100:.2f}",
+        "balance": format_cents(r["balance_cents"]),
     }
 
 
-def row_to_transaction(r, from_number=None, to_number=None):
-    d = {
-        "id": r["id"],
-        "from_account_id": r["from_account_id"],
-        "to_account_id": r["to_account_id"],
-        "amount_cents": r["amount_cents"],
-        "amount": f"{r['amount_cents'] / 100:.2f}",
-        "memo": r["memo"] or "",
-        "created_at": r["created_at"],
-    }
-    if from_number:
-        d["from_account_number"] = from_number
-    if to_number:
-        d["to_account_number"] = to_number
-    return d
+# ---------- Serialization for list responses ----------
+# List endpoints read plain tuples (no sqlite3.Row) and build response rows
+# directly. The column order is fixed by the SELECTs that feed them.
+
+def fetch_tuples(conn, query, params=()):
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur.execute(query, params).fetchall()
+
+
+def user_account_ids(conn, user_id):
+    return [aid for (aid,) in fetch_tuples(conn, "SELECT id FROM accounts WHERE user_id = ?", (user_id,))]
+
+
+def accounts_from_tuples(rows):
+    """Rows of (id, account_number, name, balance_cents)."""
+    return [
+        {"id": aid, "account_number": number, "name": name, "balance_cents": cents, "balance": format_cents(cents)}
+        for aid, number, name, cents in rows
+    ]
+
+
+def transactions_from_tuples(rows):
+    """Rows of (id, from_account_id, to_account_id, amount_cents, memo, created_at, from_num, to_num)."""
+    out = []
+    append = out.append
+    for tid, from_id, to_id, cents, memo, created_at, from_num, to_num in rows:
+        d = {
+            "id": tid,
+            "from_account_id": from_id,
+            "to_account_id": to_id,
+            "amount_cents": cents,
+            "amount": format_cents(cents),
+            "memo": memo or "",
+            "created_at": created_at,
+        }
+        if from_num:
+            d["from_account_number"] = from_num
+        if to_num:
+            d["to_account_number"] = to_num
+        append(d)
+    return out
+
+
+@cache
+def load_orjson():
+    """orjson if installed, else None. Imported on first use rather than at startup."""
+    try:
+        import orjson
+    except ImportError:  # optional; the standard library is the fallback
+        return None
+    return orjson
+
+
+def jsonify_rows(rows):
+    """jsonify() for lists of flat str/int dicts, producing the exact same bytes.
+
+    orjson is used when installed; its output is kept only if it is pure ASCII
+    without DEL, which is exactly when it matches json.dumps(ensure_ascii=True).
+    Debug output is indented by two spaces, like jsonify() in debug mode.
+    """
+    orjson = load_orjson()
+    provider = app.json
+    indent = provider.compact is False or (provider.compact is None and app.debug)
+    body = None
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            body = orjson.dumps(rows, option=option)
+        except TypeError:
+            pass
+        if body is not None and (not body.isascii() or b"\x7f" in body):
+            body = None
+    if body is None:
+        if indent:
+            body = json.dumps(rows, indent=2, sort_keys=True).encode()
+        else:
+            body = json.dumps(rows, sort_keys=True, separators=(",", ":")).encode()
+    return app.response_class(body + b"\n", mimetype=provider.mimetype)
+
+
+# ---------- Render caching ----------
+# Static pages are cached whole (they only vary by whether the nav is shown).
+# Account and transaction tables are cached as fragments tagged with the owning
+# user's data version, which triggers bump on every write to their accounts or
+# transactions. Entries also remember the Template objects they came from, so
+# an edited template (picked up by Jinja's auto-reload) is a cache miss.
+
+class LRUCache:
+    """Thread-safe, size-bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+render_cache = LRUCache(RENDER_CACHE_SIZE)
+
+
+def template_stamp(*names):
+    return tuple(app.jinja_env.get_template(n) for n in names)
+
+
+def data_version(conn, user_id):
+    rows = fetch_tuples(conn, "SELECT version FROM user_data_versions WHERE user_id = ?", (user_id,))
+    return rows[0][0] if rows else 0
+
+
+def render_static_page(template):
+    """render_template() for pages with no per-user data."""
+    key = ("page", template, "user_id" in session)
+    stamp = template_stamp(template, "base.html")
+    hit = render_cache.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    html = render_template(template)
+    render_cache.put(key, (stamp, html))
+    return html
+
+
+def cached_fragment(key, version, load, template, *includes):
+    """Rendered fragment for key at version; load() supplies the template context on a miss.
+
+    Read the version before the data, so a cached fragment is never older than its tag.
+    """
+    stamp = (version, template_stamp(template, *includes))
+    hit = render_cache.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    html = Markup(render_template(template, **load()))
+    render_cache.put(key, (stamp, html))
+    return html
+
+
+# ---------- Server-side sessions ----------
+# The cookie carries only an opaque random id. Session data lives in the
+# sessions table with a process-local LRU in front of it. Cached entries are
+# re-read from SQLite every SESSION_CACHE_REVALIDATE_SECONDS, so a revocation
+# made by another process takes effect within that window (immediately in
+# the process that made it).
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.loaded_user_id = self.get("user_id")
+        self.modified = False
+
+
+class SQLiteSessionStore:
+    """Session storage: LRU of (data, user_id, expires_at, cached_at) over the sessions table."""
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS, cache_size=SESSION_CACHE_SIZE, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self.cache = LRUCache(cache_size)
+        self._next_cleanup = 0
+
+    def load(self, sid):
+        """Return (data, expires_at) for a live session, else None."""
+        now = self.clock()
+        hit = self.cache.get(sid)
+        if hit is not None and now - hit[3] < SESSION_CACHE_REVALIDATE_SECONDS:
+            data, _, expires_at, _ = hit
+        else:
+            conn = get_db()
+            rows = fetch_tuples(conn, "SELECT data, user_id, expires_at FROM sessions WHERE id = ?", (sid,))
+            conn.close()
+            if not rows:
+                self.cache.pop(sid)
+                return None
+            raw, user_id, expires_at = rows[0]
+            data = self.serializer.loads(raw)
+            self.cache.put(sid, (data, user_id, expires_at, now))
+        if expires_at <= now:
+            return None
+        return dict(data), expires_at
+
+    def save(self, sid, data):
+        now = self.clock()
+        expires_at = int(now) + self.ttl
+        user_id = data.get("user_id")
+        conn = get_db()
+        conn.execute(
+            """INSERT INTO sessions (id, user_id, data, expires_at) VALUES (?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET user_id = excluded.user_id, data = excluded.data, expires_at = excluded.expires_at""",
+            (sid, user_id, self.serializer.dumps(data), expires_at),
+        )
+        conn.commit()
+        conn.close()
+        self.cache.put(sid, (data, user_id, expires_at, now))
+        self.maybe_cleanup(now)
+
+    def touch(self, sid):
+        """Push a live session's expiry out by a full TTL without rewriting its data."""
+        now = self.clock()
+        expires_at = int(now) + self.ttl
+        conn = get_db()
+        conn.execute("UPDATE sessions SET expires_at = ? WHERE id = ?", (expires_at, sid))
+        conn.commit()
+        conn.close()
+        hit = self.cache.get(sid)
+        if hit is not None:
+            self.cache.put(sid, (hit[0], hit[1], expires_at, hit[3]))
+
+    def delete(self, sid):
+        conn = get_db()
+        conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+        conn.commit()
+        conn.close()
+        self.cache.pop(sid)
+
+    def revoke_user(self, user_id):
+        """Delete every session belonging to user_id. Returns how many were removed."""
+        conn = get_db()
+        sids = fetch_tuples(conn, "DELETE FROM sessions WHERE user_id = ? RETURNING id", (user_id,))
+        conn.commit()
+        conn.close()
+        for (sid,) in sids:
+            self.cache.pop(sid)
+        return len(sids)
+
+    def revoke_all(self):
+        conn = get_db()
+        count = conn.execute("DELETE FROM sessions").rowcount
+        conn.commit()
+        conn.close()
+        self.cache.clear()
+        return count
+
+    def cleanup_expired(self, batch_size=SESSION_CLEANUP_BATCH):
+        """Delete expired sessions in batches of batch_size. Returns how many were removed."""
+        now = int(self.clock())
+        removed = 0
+        conn = get_db()
+        try:
+            while True:
+                sids = fetch_tuples(
+                    conn,
+                    "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions WHERE expires_at <= ? LIMIT ?) RETURNING id",
+                    (now, batch_size),
+                )
+                conn.commit()
+                for (sid,) in sids:
+                    self.cache.pop(sid)
+                removed += len(sids)
+                if len(sids) < batch_size:
+                    break
+        finally:
+            conn.close()
+        return removed
+
+    def maybe_cleanup(self, now):
+        if now >= self._next_cleanup:
+            self._next_cleanup = now + SESSION_CLEANUP_INTERVAL
+            self.cleanup_expired()
+
+
+class ServerSessionInterface(SessionInterface):
+    """Flask session interface over a session store (see SQLiteSessionStore)."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            found = self.store.load(sid)
+            if found is not None:
+                data, expires_at = found
+                return ServerSession(data, sid=sid, expires_at=expires_at)
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session:
+            if session.modified:
+                if session.sid:
+                    self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure, samesite=samesite, httponly=httponly)
+                response.vary.add("Cookie")
+            return
+
+        if not session.modified:
+            if session.expires_at - self.store.clock() < self.store.ttl / 2:
+                self.store.touch(session.sid)
+            return
+
+        # A new id whenever the logged-in user changes, so a pre-login id can't be fixed on a victim.
+        if session.sid is None or session.get("user_id") != session.loaded_user_id:
+            if session.sid:
+                self.store.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+        self.store.save(session.sid, dict(session))
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=httponly,
+            domain=domain,
+            path=path,
+            secure=secure,
+            samesite=samesite,
+        )
+        response.vary.add("Cookie")
+
+
+session_store = SQLiteSessionStore()
+app.session_interface = ServerSessionInterface(session_store)
+
+
+@app.cli.command("revoke-sessions")
+@click.option("--user", "username", help="Only revoke this user's sessions.")
+def revoke_sessions_command(username):
+    """Log users out by deleting their server-side sessions."""
+    init_db()
+    if username is None:
+        click.echo(f"Revoked {session_store.revoke_all()} sessions")
+        return
+    conn = get_db()
+    row = conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
+    conn.close()
+    if not row:
+        raise click.ClickException(f"No such user: {username}")
+    click.echo(f"Revoked {session_store.revoke_user(row['id'])} sessions for {username}")
+
+
+def check_transfer(conn, from_id, to_id, amount_cents):
+    """Return (error, status) if the transfer cannot go through, else None."""
+    from_row = conn.execute("SELECT id, user_id, balance_cents FROM accounts WHERE id = ?", (from_id,)).fetchone()
+    to_row = conn.execute("SELECT id FROM accounts WHERE id = ?", (to_id,)).fetchone()
+    if not from_row or not to_row:
+        return "Account not found", 404
+    if from_row["balance_cents"] < amount_cents:
+        return "Insufficient balance", 400
+    return None
+
+
+def apply_transfer(conn, from_id, to_id, amount_cents, memo, now=None):
+    """Move the money and record the transaction. The caller commits."""
+    if now is None:
+        now = datetime.utcnow().isoformat() + "Z"
+    conn.execute(
+        "UPDATE accounts SET balance_cents = balance_cents - ? WHERE id = ?",
+        (amount_cents, from_id),
+    )
+    conn.execute(
+        "UPDATE accounts SET balance_cents = balance_cents + ? WHERE id = ?",
+        (amount_cents, to_id),
+    )
+    cur = conn.execute(
+        "INSERT INTO transactions (from_account_id, to_account_id, amount_cents, memo, created_at) VALUES (?, ?, ?, ?, ?)",
+        (from_id, to_id, amount_cents, memo, now),
+    )
+    return cur.lastrowid
+
+
+# ---------- Transaction archive (hot/cold partitioning) ----------
+# Transactions older than ARCHIVE_AFTER_DAYS move to one SQLite file per month
+# under ARCHIVE_DIR. Every archived row is older than every hot row, so history
+# reads scan the hot table first and only attach archives (newest month first)
+# when a page reaches past the cutoff.
+
+ARCHIVE_DDL = """
+    CREATE TABLE IF NOT EXISTS archive.transactions (
+        id INTEGER PRIMARY KEY,
+        from_account_id INTEGER NOT NULL,
+        to_account_id INTEGER NOT NULL,
+        amount_cents INTEGER NOT NULL,
+        memo TEXT,
+        created_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS archive.idx_transactions_from ON transactions (from_account_id, created_at);
+    CREATE INDEX IF NOT EXISTS archive.idx_transactions_to ON transactions (to_account_id, created_at);
+    CREATE INDEX IF NOT EXISTS archive.idx_transactions_created_at ON transactions (created_at);
+"""
+
+
+def fetch_history(conn, query, params, limit, accounts):
+    """Run a history query (``{transactions}`` table, trailing ``LIMIT ?``) over hot rows, then archives.
+
+    Only archives holding rows for one of ``accounts`` (account ids the query can match) are attached.
+    Rows come back as plain tuples in SELECT order.
+    """
+    rows = fetch_tuples(conn, query.format(transactions="main.transactions"), (*params, limit))
+    if len(rows) >= limit:
+        return rows
+    archives = fetch_tuples(
+        conn,
+        """SELECT filename FROM transaction_archives
+           WHERE month IN (SELECT month FROM transaction_archive_accounts WHERE account_id IN (SELECT value FROM json_each(?)))
+           ORDER BY month DESC""",
+        (json.dumps(list(accounts)),),
+    )
+    for (filename,) in archives:
+        if not attach_archive(conn, filename):
+            continue
+        try:
+            rows += fetch_tuples(conn, query.format(transactions="archive.transactions"), (*params, limit - len(rows)))
+        except sqlite3.DatabaseError as exc:
+            app.logger.warning("Skipping archive %s: %s", filename, exc)
+        finally:
+            conn.execute("DETACH DATABASE archive")
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def attach_archive(conn, filename):
+    """Attach an archive file read-only as ``archive``; log and return False if it cannot be opened.
+
+    Needs a connection opened with ``uri=True``. Read-only mode makes a missing file fail here
+    instead of being created empty.
+    """
+    uri = "file:" + quote(os.path.join(ARCHIVE_DIR, filename)) + "?mode=ro"
+    try:
+        conn.execute("ATTACH DATABASE ? AS archive", (uri,))
+    except sqlite3.DatabaseError as exc:
+        app.logger.warning("Skipping archive %s: %s", filename, exc)
+        return False
+    return True
+
+
+def index_archive_accounts(conn):
+    """Fill transaction_archive_accounts for archives written before it existed."""
+    months = fetch_tuples(
+        conn,
+        """SELECT month, filename FROM transaction_archives a
+           WHERE NOT EXISTS (SELECT 1 FROM transaction_archive_accounts WHERE month = a.month)""",
+    )
+    for month, filename in months:
+        if not attach_archive(conn, filename):
+            continue
+        try:
+            conn.execute(
+                """INSERT OR IGNORE INTO transaction_archive_accounts (account_id, month)
+                   SELECT from_account_id, ?1 FROM archive.transactions
+                   UNION SELECT to_account_id, ?1 FROM archive.transactions""",
+                (month,),
+            )
+            conn.commit()
+        finally:
+            conn.execute("DETACH DATABASE archive")
+
+
+def archive_transactions(max_age_days=ARCHIVE_AFTER_DAYS, now=None):
+    """Move transactions older than max_age_days into monthly archive files. Returns rows moved."""
+    now = now or datetime.utcnow()
+    cutoff = (now - timedelta(days=max_age_days)).isoformat() + "Z"
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    conn = get_db()
+    moved = 0
+    try:
+        months = [r[0] for r in conn.execute(
+            "SELECT DISTINCT substr(created_at, 1, 7) FROM transactions WHERE created_at < ? ORDER BY 1",
+            (cutoff,),
+        )]
+        for month in months:
+            year, mon = int(month[:4]), int(month[5:7])
+            next_month = f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+            upper = min(cutoff, next_month)
+            filename = f"transactions-{month}.db"
+            # ATTACH is not allowed inside a transaction, so attach first and move the month atomically.
+            conn.execute("ATTACH DATABASE ? AS archive", (os.path.join(ARCHIVE_DIR, filename),))
+            try:
+                conn.executescript(ARCHIVE_DDL)
+                conn.execute("BEGIN IMMEDIATE")
+                cur = conn.execute(
+                    """INSERT INTO archive.transactions (id, from_account_id, to_account_id, amount_cents, memo, created_at)
+                       SELECT id, from_account_id, to_account_id, amount_cents, memo, created_at
+                       FROM main.transactions WHERE created_at >= ? AND created_at < ?""",
+                    (month, upper),
+                )
+                conn.execute(
+                    """INSERT OR IGNORE INTO transaction_archive_accounts (account_id, month)
+                       SELECT from_account_id, ?1 FROM main.transactions WHERE created_at >= ?2 AND created_at < ?3
+                       UNION SELECT to_account_id, ?1 FROM main.transactions WHERE created_at >= ?2 AND created_at < ?3""",
+                    (month, month, upper),
+                )
+                conn.execute("DELETE FROM main.transactions WHERE created_at >= ? AND created_at < ?", (month, upper))
+                conn.execute(
+                    """INSERT INTO transaction_archives (month, filename, archived_through) VALUES (?, ?, ?)
+                       ON CONFLICT(month) DO UPDATE SET archived_through = MAX(archived_through, excluded.archived_through)""",
+                    (month, filename, upper),
+                )
+                conn.commit()
+                moved += cur.rowcount
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.execute("DETACH DATABASE archive")
+    finally:
+        conn.close()
+    return moved
+
+
+@app.cli.command("archive-transactions")
+@click.option("--days", default=ARCHIVE_AFTER_DAYS, show_default=True, help="Archive transactions older than this many days.")
+def archive_transactions_command(days):
+    """Move old transactions into monthly archive databases."""
+    init_db()
+    click.echo(f"Archived {archive_transactions(days)} transactions into {ARCHIVE_DIR}")
 
 
 # ---------- Auth ----------
@@ -190,12 +900,13 @@ def api_users_search():
 def api_user_accounts(user_id):
     """Return accounts for a user (e.g. payee) so the sender can choose which account to send to."""
     conn = get_db()
-    rows = conn.execute(
+    rows = fetch_tuples(
+        conn,
         "SELECT id, account_number, name, balance_cents FROM accounts WHERE user_id = ?",
         (user_id,),
-    ).fetchall()
+    )
     conn.close()
-    return jsonify([row_to_account(r) for r in rows])
+    return jsonify_rows(accounts_from_tuples(rows))
 
 
 # ---------- Accounts – IDOR: no ownership check on GET /api/accounts/<id> ----------
@@ -204,12 +915,13 @@ def api_user_accounts(user_id):
 @login_required
 def api_accounts_list():
     conn = get_db()
-    rows = conn.execute(
+    rows = fetch_tuples(
+        conn,
         "SELECT id, account_number, name, balance_cents FROM accounts WHERE user_id = ?",
         (session["user_id"],),
-    ).fetchall()
+    )
     conn.close()
-    return jsonify([row_to_account(r) for r in rows])
+    return jsonify_rows(accounts_from_tuples(rows))
 
 
 @app.route("/api/accounts/<int:account_id>", methods=["GET"])
@@ -235,21 +947,21 @@ def api_transactions_list():
     if not account_id:
         return jsonify({"error": "account_id required"}), 400
     conn = get_db()
-    rows = conn.execute(
+    rows = fetch_history(
+        conn,
         """SELECT t.id, t.from_account_id, t.to_account_id, t.amount_cents, t.memo, t.created_at,
                   a_from.account_number AS from_num, a_to.account_number AS to_num
-           FROM transactions t
+           FROM {transactions} t
            JOIN accounts a_from ON a_from.id = t.from_account_id
            JOIN accounts a_to ON a_to.id = t.to_account_id
            WHERE t.from_account_id = ? OR t.to_account_id = ?
-           ORDER BY t.created_at DESC LIMIT 50""",
+           ORDER BY t.created_at DESC LIMIT ?""",
         (account_id, account_id),
-    ).fetchall()
+        50,
+        [account_id],
+    )
     conn.close()
-    out = []
-    for r in rows:
-        out.append(row_to_transaction(r, from_number=r["from_num"], to_number=r["to_num"]))
-    return jsonify(out)
+    return jsonify_rows(transactions_from_tuples(rows))
 
 
 # ---------- All my transactions (across all my accounts) ----------
@@ -258,21 +970,21 @@ def api_transactions_list():
 @login_required
 def api_transactions_all():
     conn = get_db()
-    rows = conn.execute(
+    rows = fetch_history(
+        conn,
         """SELECT t.id, t.from_account_id, t.to_account_id, t.amount_cents, t.memo, t.created_at,
                   a_from.account_number AS from_num, a_to.account_number AS to_num
-           FROM transactions t
+           FROM {transactions} t
            JOIN accounts a_from ON a_from.id = t.from_account_id
            JOIN accounts a_to ON a_to.id = t.to_account_id
            JOIN accounts my_acc ON (my_acc.id = t.from_account_id OR my_acc.id = t.to_account_id) AND my_acc.user_id = ?
-           ORDER BY t.created_at DESC LIMIT 100""",
+           ORDER BY t.created_at DESC LIMIT ?""",
         (session["user_id"],),
-    ).fetchall()
+        100,
+        user_account_ids(conn, session["user_id"]),
+    )
     conn.close()
-    out = []
-    for r in rows:
-        out.append(row_to_transaction(r, from_number=r["from_num"], to_number=r["to_num"]))
-    return jsonify(out)
+    return jsonify_rows(transactions_from_tuples(rows))
 
 
 # ---------- Transfer – IDOR: from_account_id not validated ----------
@@ -292,28 +1004,13 @@ def api_transfer():
         return jsonify({"error": "Same account"}), 400
 
     conn = get_db()
-    from_row = conn.execute("SELECT id, user_id, balance_cents FROM accounts WHERE id = ?", (from_id,)).fetchone()
-    to_row = conn.execute("SELECT id FROM accounts WHERE id = ?", (to_id,)).fetchone()
-    if not from_row or not to_row:
-        conn.close()
-        return jsonify({"error": "Account not found"}), 404
-    if from_row["balance_cents"] < amount_cents:
+    problem = check_transfer(conn, from_id, to_id, amount_cents)
+    if problem:
         conn.close()
-        return jsonify({"error": "Insufficient balance"}), 400
+        error, status = problem
+        return jsonify({"error": error}), status
 
-    now = datetime.utcnow().isoformat() + "Z"
-    conn.execute(
-        "UPDATE accounts SET balance_cents = balance_cents - ? WHERE id = ?",
-        (amount_cents, from_id),
-    )
-    conn.execute(
-        "UPDATE accounts SET balance_cents = balance_cents + ? WHERE id = ?",
-        (amount_cents, to_id),
-    )
-    conn.execute(
-        "INSERT INTO transactions (from_account_id, to_account_id, amount_cents, memo, created_at) VALUES (?, ?, ?, ?, ?)",
-        (from_id, to_id, amount_cents, memo, now),
-    )
+    apply_transfer(conn, from_id, to_id, amount_cents, memo)
     conn.commit()
     conn.close()
     return jsonify({"ok": True, "message": "Transfer completed"})
@@ -376,12 +1073,388 @@ def api_payees_delete(payee_id):
     return jsonify({"ok": True})
 
 
+# ---------- Scheduled and recurring transfers ----------
+
+def ts_to_iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def parse_run_at(value, now):
+    """Accept Unix seconds or an ISO-8601 timestamp (UTC if no offset). Returns int seconds or None.
+
+    Anything before the epoch or more than SCHEDULER_MAX_HORIZON after now is rejected.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            return None
+        ts = value
+    elif isinstance(value, str):
+        try:
+            dt = datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        ts = dt.timestamp()
+    else:
+        return None
+    if not 0 <= ts <= now + SCHEDULER_MAX_HORIZON:
+        return None
+    return int(ts)
+
+
+INTERVAL_ERROR = f"interval_seconds must be an integer from {SCHEDULER_MIN_INTERVAL} to {SCHEDULER_MAX_INTERVAL}"
+
+
+def valid_interval(interval):
+    return interval is not None and SCHEDULER_MIN_INTERVAL <= interval <= SCHEDULER_MAX_INTERVAL
+
+
+def valid_amount(amount_cents):
+    return amount_cents is not None and 0 < amount_cents <= SCHEDULER_MAX_AMOUNT_CENTS
+
+
+def json_int(data, key):
+    value = data.get(key)
+    if isinstance(value, bool) or not isinstance(value, int):
+        return None
+    return value
+
+
+def json_memo(data):
+    """The request memo cut to 500 characters, "" if missing, None if not a string."""
+    memo = data.get("memo")
+    if memo is None:
+        return ""
+    if not isinstance(memo, str):
+        return None
+    return memo[:500]
+
+
+def row_to_scheduled_transfer(r):
+    return {
+        "id": r["id"],
+        "from_account_id": r["from_account_id"],
+        "to_account_id": r["to_account_id"],
+        "amount_cents": r["amount_cents"],
+        "amount": format_cents(r["amount_cents"]),
+        "memo": r["memo"] or "",
+        "interval_seconds": r["interval_seconds"],
+        "due_at": ts_to_iso(r["due_at"]),
+        "next_run_at": ts_to_iso(r["next_run_at"]),
+        "status": r["status"],
+        "attempts": r["attempts"],
+        "last_error": r["last_error"],
+        "last_run_at": ts_to_iso(r["last_run_at"]) if r["last_run_at"] is not None else None,
+        "created_at": r["created_at"],
+    }
+
+
+def next_occurrence(due_at, interval_seconds, now):
+    """First slot on due_at's interval grid strictly after now (missed slots are skipped, not replayed)."""
+    missed = (now - due_at) // interval_seconds + 1
+    return due_at + max(missed, 1) * interval_seconds
+
+
+class TransferScheduler:
+    """Background executor for scheduled transfers.
+
+    Due rows are found through the partial index on next_run_at and executed in
+    batches, one write transaction per batch, using the same balance checks as
+    /api/transfer. due_at is the grid slot being run and only moves once that
+    slot succeeds or is given up on; retries only move next_run_at, so a
+    recurring series never drifts. ``clock`` returns Unix seconds and can be
+    replaced to drive the scheduler by hand.
+    """
+
+    def __init__(self, clock=time.time, batch_size=SCHEDULER_BATCH_SIZE, poll_interval=SCHEDULER_POLL_SECONDS):
+        self.clock = clock
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_due(self):
+        """Execute everything due at clock(). Returns (completed, failed)."""
+        now = int(self.clock())
+        completed = failed = 0
+        conn = get_db()
+        try:
+            while True:
+                seen, ok, bad = self._run_batch(conn, now)
+                completed += ok
+                failed += bad
+                if seen < self.batch_size:
+                    break
+        finally:
+            conn.close()
+        return completed, failed
+
+    def _run_batch(self, conn, now):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                """SELECT id, from_account_id, to_account_id, amount_cents, memo, interval_seconds, due_at, attempts
+                   FROM scheduled_transfers
+                   WHERE status = 'active' AND next_run_at <= ?
+                   ORDER BY next_run_at LIMIT ?""",
+                (now, self.batch_size),
+            ).fetchall()
+            created_at = ts_to_iso(now)
+            failed = 0
+            for r in rows:
+                # One bad row must not sink the batch: undo just its writes and fail it.
+                conn.execute("SAVEPOINT scheduled_row")
+                try:
+                    ok = self._run_one(conn, r, now, created_at)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO scheduled_row")
+                    error = f"{type(e).__name__}: {e}"
+                    conn.execute(
+                        "UPDATE scheduled_transfers SET status = 'failed', last_error = ?, last_run_at = ? WHERE id = ?",
+                        (error, now, r["id"]),
+                    )
+                    self._record_failure(conn, r, error, now, r["attempts"] + 1, None)
+                    ok = False
+                conn.execute("RELEASE scheduled_row")
+                failed += not ok
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(rows), len(rows) - failed, failed
+
+    def _run_one(self, conn, r, now, created_at):
+        """Run one due row inside the batch transaction. Returns False if it failed."""
+        interval = r["interval_seconds"]
+        problem = check_transfer(conn, r["from_account_id"], r["to_account_id"], r["amount_cents"])
+        if problem is None:
+            apply_transfer(conn, r["from_account_id"], r["to_account_id"], r["amount_cents"], r["memo"] or "", created_at)
+            if interval:
+                conn.execute(
+                    "UPDATE scheduled_transfers SET due_at = ?1, next_run_at = ?1, attempts = 0, last_error = NULL, last_run_at = ?2 WHERE id = ?3",
+                    (next_occurrence(r["due_at"], interval, now), now, r["id"]),
+                )
+            else:
+                conn.execute(
+                    "UPDATE scheduled_transfers SET status = 'done', last_error = NULL, last_run_at = ? WHERE id = ?",
+                    (now, r["id"]),
+                )
+            return True
+        error = problem[0]
+        attempt = r["attempts"] + 1
+        if attempt < SCHEDULER_MAX_ATTEMPTS:
+            retry_at = now + SCHEDULER_RETRY_SECONDS * 2 ** (attempt - 1)
+            conn.execute(
+                "UPDATE scheduled_transfers SET attempts = ?, next_run_at = ?, last_error = ?, last_run_at = ? WHERE id = ?",
+                (attempt, retry_at, error, now, r["id"]),
+            )
+        elif interval:
+            # Give up on this occurrence but keep the series alive.
+            retry_at = next_occurrence(r["due_at"], interval, now)
+            conn.execute(
+                "UPDATE scheduled_transfers SET due_at = ?1, next_run_at = ?1, attempts = 0, last_error = ?2, last_run_at = ?3 WHERE id = ?4",
+                (retry_at, error, now, r["id"]),
+            )
+        else:
+            retry_at = None
+            conn.execute(
+                "UPDATE scheduled_transfers SET status = 'failed', attempts = ?, last_error = ?, last_run_at = ? WHERE id = ?",
+                (attempt, error, now, r["id"]),
+            )
+        self._record_failure(conn, r, error, now, attempt, retry_at)
+        return False
+
+    def _record_failure(self, conn, r, error, now, attempt, retry_at):
+        conn.execute(
+            "INSERT INTO scheduled_transfer_failures (scheduled_transfer_id, attempt, error, failed_at, retry_at) VALUES (?, ?, ?, ?, ?)",
+            (r["id"], attempt, error, now, retry_at),
+        )
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="transfer-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.run_due()
+            except Exception:
+                # Keep polling; a broken batch must not stop everyone's transfers.
+                app.logger.exception("Scheduled transfer batch failed")
+
+
+scheduler = TransferScheduler()
+
+
+@app.route("/api/scheduled-transfers", methods=["GET"])
+@login_required
+def api_scheduled_transfers_list():
+    conn = get_db()
+    rows = conn.execute(
+        "SELECT * FROM scheduled_transfers WHERE user_id = ? ORDER BY next_run_at",
+        (session["user_id"],),
+    ).fetchall()
+    conn.close()
+    return jsonify([row_to_scheduled_transfer(r) for r in rows])
+
+
+@app.route("/api/scheduled-transfers", methods=["POST"])
+@login_required
+def api_scheduled_transfers_add():
+    data = request.get_json(force=True, silent=True) or {}
+    from_id = json_int(data, "from_account_id")
+    to_id = json_int(data, "to_account_id")
+    amount_cents = json_int(data, "amount_cents")
+    memo = json_memo(data)
+    interval = data.get("interval_seconds")
+    now = int(time.time())
+    run_at = parse_run_at(data["run_at"], now) if data.get("run_at") is not None else now
+
+    if not from_id or not to_id or not valid_amount(amount_cents):
+        return jsonify({"error": "Invalid from_account_id, to_account_id, or amount_cents"}), 400
+    if from_id == to_id:
+        return jsonify({"error": "Same account"}), 400
+    if memo is None:
+        return jsonify({"error": "memo must be a string"}), 400
+    if run_at is None:
+        return jsonify({"error": "Invalid run_at"}), 400
+    if interval is not None and not valid_interval(json_int(data, "interval_seconds")):
+        return jsonify({"error": INTERVAL_ERROR}), 400
+
+    conn = get_db()
+    from_row = conn.execute("SELECT id FROM accounts WHERE id = ? AND user_id = ?", (from_id, session["user_id"])).fetchone()
+    to_row = conn.execute("SELECT id FROM accounts WHERE id = ?", (to_id,)).fetchone()
+    if not from_row or not to_row:
+        conn.close()
+        return jsonify({"error": "Account not found"}), 404
+    cur = conn.execute(
+        """INSERT INTO scheduled_transfers
+           (user_id, from_account_id, to_account_id, amount_cents, memo, interval_seconds, due_at, next_run_at, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (session["user_id"], from_id, to_id, amount_cents, memo, interval, run_at, run_at, datetime.utcnow().isoformat() + "Z"),
+    )
+    conn.commit()
+    rid = cur.lastrowid
+    conn.close()
+    return jsonify({"ok": True, "id": rid})
+
+
+@app.route("/api/scheduled-transfers/<int:st_id>", methods=["GET"])
+@login_required
+def api_scheduled_transfer_detail(st_id):
+    conn = get_db()
+    row = conn.execute(
+        "SELECT * FROM scheduled_transfers WHERE id = ? AND user_id = ?",
+        (st_id, session["user_id"]),
+    ).fetchone()
+    conn.close()
+    if not row:
+        return jsonify({"error": "Scheduled transfer not found"}), 404
+    return jsonify(row_to_scheduled_transfer(row))
+
+
+@app.route("/api/scheduled-transfers/<int:st_id>", methods=["PATCH"])
+@login_required
+def api_scheduled_transfer_update(st_id):
+    data = request.get_json(force=True, silent=True) or {}
+    changes = {}
+    if "amount_cents" in data:
+        amount_cents = json_int(data, "amount_cents")
+        if not valid_amount(amount_cents):
+            return jsonify({"error": "Invalid amount_cents"}), 400
+        changes["amount_cents"] = amount_cents
+    if "memo" in data:
+        memo = json_memo(data)
+        if memo is None:
+            return jsonify({"error": "memo must be a string"}), 400
+        changes["memo"] = memo
+    if "run_at" in data:
+        run_at = parse_run_at(data["run_at"], int(time.time()))
+        if run_at is None:
+            return jsonify({"error": "Invalid run_at"}), 400
+        changes["due_at"] = run_at
+        changes["next_run_at"] = run_at
+    if "interval_seconds" in data:
+        interval = data["interval_seconds"]
+        if interval is not None and not valid_interval(json_int(data, "interval_seconds")):
+            return jsonify({"error": INTERVAL_ERROR}), 400
+        changes["interval_seconds"] = interval
+    if "status" in data:
+        if data["status"] not in ("active", "paused"):
+            return jsonify({"error": "status must be 'active' or 'paused'"}), 400
+        changes["status"] = data["status"]
+        if data["status"] == "active":
+            changes["attempts"] = 0
+    if not changes:
+        return jsonify({"error": "Nothing to update"}), 400
+
+    conn = get_db()
+    # Column names come from the fixed keys above, never from the request.
+    assignments = ", ".join(f"{col} = ?" for col in changes)
+    cur = conn.execute(
+        f"UPDATE scheduled_transfers SET {assignments} WHERE id = ? AND user_id = ? AND status IN ('active', 'paused', 'failed')",
+        (*changes.values(), st_id, session["user_id"]),
+    )
+    conn.commit()
+    conn.close()
+    if cur.rowcount == 0:
+        return jsonify({"error": "Scheduled transfer not found"}), 404
+    return jsonify({"ok": True})
+
+
+@app.route("/api/scheduled-transfers/<int:st_id>", methods=["DELETE"])
+@login_required
+def api_scheduled_transfer_delete(st_id):
+    conn = get_db()
+    cur = conn.execute("DELETE FROM scheduled_transfers WHERE id = ? AND user_id = ?", (st_id, session["user_id"]))
+    if cur.rowcount:
+        conn.execute("DELETE FROM scheduled_transfer_failures WHERE scheduled_transfer_id = ?", (st_id,))
+    conn.commit()
+    conn.close()
+    return jsonify({"ok": True})
+
+
+@app.route("/api/scheduled-transfers/<int:st_id>/failures", methods=["GET"])
+@login_required
+def api_scheduled_transfer_failures(st_id):
+    conn = get_db()
+    rows = conn.execute(
+        """SELECT f.attempt, f.error, f.failed_at, f.retry_at
+           FROM scheduled_transfer_failures f
+           JOIN scheduled_transfers st ON st.id = f.scheduled_transfer_id
+           WHERE st.id = ? AND st.user_id = ?
+           ORDER BY f.id""",
+        (st_id, session["user_id"]),
+    ).fetchall()
+    conn.close()
+    return jsonify([
+        {
+            "attempt": r["attempt"],
+            "error": r["error"],
+            "failed_at": ts_to_iso(r["failed_at"]),
+            "retry_at": ts_to_iso(r["retry_at"]) if r["retry_at"] is not None else None,
+        }
+        for r in rows
+    ])
+
+
 # ---------- Web UI ----------
 
 @app.route("/login", methods=["GET", "POST"])
 def login_page():
     if request.method == "GET":
-        return render_template("login.html")
+        return render_static_page("login.html")
     username = request.form.get("username", "").strip()
     password = request.form.get("password", "")
     if not username:
@@ -404,16 +1477,23 @@ def login_page():
 @app.route("/dashboard")
 @login_required
 def dashboard():
+    user_id = session["user_id"]
     conn = get_db()
-    accounts = conn.execute(
-        "SELECT id, account_number, name, balance_cents FROM accounts WHERE user_id = ?",
-        (session["user_id"],),
-    ).fetchall()
+
+    def load():
+        accounts = fetch_tuples(
+            conn,
+            "SELECT id, account_number, name, balance_cents FROM accounts WHERE user_id = ?",
+            (user_id,),
+        )
+        return {"accounts": accounts_from_tuples(accounts)}
+
+    accounts_html = cached_fragment(("accounts", user_id), data_version(conn, user_id), load, "fragments/accounts_table.html")
     conn.close()
     return render_template(
         "dashboard.html",
         full_name=session.get("full_name"),
-        accounts=[row_to_account(r) for r in accounts],
+        accounts_html=accounts_html,
     )
 
 
@@ -441,21 +1521,31 @@ def profile_page():
 @app.route("/transactions")
 @login_required
 def transactions_page():
+    user_id = session["user_id"]
     conn = get_db()
-    rows = conn.execute(
-        """SELECT DISTINCT t.id, t.from_account_id, t.to_account_id, t.amount_cents, t.memo, t.created_at,
-                  a_from.account_number AS from_num, a_to.account_number AS to_num
-           FROM transactions t
-           JOIN accounts a_from ON a_from.id = t.from_account_id
-           JOIN accounts a_to ON a_to.id = t.to_account_id
-           WHERE (t.from_account_id IN (SELECT id FROM accounts WHERE user_id = ?)
-                  OR t.to_account_id IN (SELECT id FROM accounts WHERE user_id = ?))
-           ORDER BY t.created_at DESC LIMIT 100""",
-        (session["user_id"], session["user_id"]),
-    ).fetchall()
+
+    def load():
+        rows = fetch_history(
+            conn,
+            """SELECT DISTINCT t.id, t.from_account_id, t.to_account_id, t.amount_cents, t.memo, t.created_at,
+                      a_from.account_number AS from_num, a_to.account_number AS to_num
+               FROM {transactions} t
+               JOIN accounts a_from ON a_from.id = t.from_account_id
+               JOIN accounts a_to ON a_to.id = t.to_account_id
+               WHERE (t.from_account_id IN (SELECT id FROM accounts WHERE user_id = ?)
+                      OR t.to_account_id IN (SELECT id FROM accounts WHERE user_id = ?))
+               ORDER BY t.created_at DESC LIMIT ?""",
+            (user_id, user_id),
+            100,
+            user_account_ids(conn, user_id),
+        )
+        return {"transactions": transactions_from_tuples(rows)}
+
+    transactions_html = cached_fragment(
+        ("transactions", user_id), data_version(conn, user_id), load, "fragments/transactions_table.html"
+    )
     conn.close()
-    transactions = [row_to_transaction(r, from_number=r["from_num"], to_number=r["to_num"]) for r in rows]
-    return render_template("transactions.html", transactions=transactions)
+    return render_template("transactions.html", transactions_html=transactions_html)
 
 
 @app.route("/payees")
@@ -480,29 +1570,37 @@ def payees_page():
 def account_page(account_id):
     conn = get_db()
     row = conn.execute(
-        "SELECT id, user_id, account_number, name, balance_cents FROM accounts WHERE id = ?",
+        """SELECT a.id, a.user_id, a.account_number, a.name, a.balance_cents, COALESCE(v.version, 0) AS version
+           FROM accounts a LEFT JOIN user_data_versions v ON v.user_id = a.user_id
+           WHERE a.id = ?""",
         (account_id,),
     ).fetchone()
     if not row:
         conn.close()
         return "Account not found", 404
-    tx_rows = conn.execute(
-        """SELECT t.id, t.from_account_id, t.to_account_id, t.amount_cents, t.memo, t.created_at,
-                  a_from.account_number AS from_num, a_to.account_number AS to_num
-           FROM transactions t
-           JOIN accounts a_from ON a_from.id = t.from_account_id
-           JOIN accounts a_to ON a_to.id = t.to_account_id
-           WHERE t.from_account_id = ? OR t.to_account_id = ?
-           ORDER BY t.created_at DESC LIMIT 50""",
-        (account_id, account_id),
-    ).fetchall()
-    conn.close()
-    transactions = [row_to_transaction(r, from_number=r["from_num"], to_number=r["to_num"]) for r in tx_rows]
-    return render_template(
-        "account.html",
-        account=row_to_account(row),
-        transactions=transactions,
+
+    def load():
+        tx_rows = fetch_history(
+            conn,
+            """SELECT t.id, t.from_account_id, t.to_account_id, t.amount_cents, t.memo, t.created_at,
+                      a_from.account_number AS from_num, a_to.account_number AS to_num
+               FROM {transactions} t
+               JOIN accounts a_from ON a_from.id = t.from_account_id
+               JOIN accounts a_to ON a_to.id = t.to_account_id
+               WHERE t.from_account_id = ? OR t.to_account_id = ?
+               ORDER BY t.created_at DESC LIMIT ?""",
+            (account_id, account_id),
+            50,
+            [account_id],
+        )
+        return {"account": row_to_account(row), "transactions": transactions_from_tuples(tx_rows)}
+
+    account_html = cached_fragment(
+        ("account", account_id), row["version"], load,
+        "fragments/account_detail.html", "fragments/transactions_table.html",
     )
+    conn.close()
+    return render_template("account.html", account_html=account_html)
 
 
 @app.route("/transfer", methods=["GET", "POST"])
@@ -535,7 +1633,7 @@ def transfer_page():
                 "full_name": r["full_name"],
                 "name": r["name"],
                 "account_number": r["account_number"],
-                "balance": f"{r['balance_cents'] / 100:.2f}",
+                "balance": format_cents(r["balance_cents"]),
             }
             for r in recipient_accounts
         ]
@@ -555,33 +1653,19 @@ def transfer_page():
         payees = conn.execute("""SELECT sp.payee_user_id, sp.label, u.username, u.full_name FROM saved_payees sp JOIN users u ON u.id = sp.payee_user_id WHERE sp.user_id = ? ORDER BY sp.label""", (session["user_id"],)).fetchall()
         recipient_accounts = conn.execute("""SELECT a.id, a.account_number, a.name, a.balance_cents, u.full_name FROM accounts a JOIN users u ON u.id = a.user_id WHERE a.user_id != ? ORDER BY u.full_name, a.name""", (session["user_id"],)).fetchall()
         conn.close()
-        recipients = [{"id": r["id"], "full_name": r["full_name"], "name": r["name"], "account_number": r["account_number"], "balance": f"{r['balance_cents'] / 100:.2f}"} for r in recipient_accounts]
+        recipients = [{"id": r["id"], "full_name": r["full_name"], "name": r["name"], "account_number": r["account_number"], "balance": format_cents(r["balance_cents"])} for r in recipient_accounts]
         return render_template("transfer.html", accounts=[row_to_account(r) for r in accounts], saved_payees=[dict(r) for r in payees], recipient_accounts=recipients, error="Invalid form data")
     amount_cents = int(round(amount * 100))
     conn = get_db()
-    from_row = conn.execute("SELECT id, user_id, balance_cents FROM accounts WHERE id = ?", (from_id,)).fetchone()
-    to_row = conn.execute("SELECT id FROM accounts WHERE id = ?", (to_id,)).fetchone()
-    if not from_row or not to_row:
-        acc = conn.execute("SELECT id, account_number, name, balance_cents FROM accounts WHERE user_id = ?", (session["user_id"],)).fetchall()
-        pay = conn.execute("""SELECT sp.payee_user_id, sp.label, u.username, u.full_name FROM saved_payees sp JOIN users u ON u.id = sp.payee_user_id WHERE sp.user_id = ? ORDER BY sp.label""", (session["user_id"],)).fetchall()
-        r_rows = conn.execute("""SELECT a.id, a.account_number, a.name, a.balance_cents, u.full_name FROM accounts a JOIN users u ON u.id = a.user_id WHERE a.user_id != ? ORDER BY u.full_name, a.name""", (session["user_id"],)).fetchall()
-        recipients = [{"id": r["id"], "full_name": r["full_name"], "name": r["name"], "account_number": r["account_number"], "balance": f"{r['balance_cents'] / 100:.2f}"} for r in r_rows]
-        conn.close()
-        return render_template("transfer.html", accounts=[row_to_account(r) for r in acc], saved_payees=[dict(r) for r in pay], recipient_accounts=recipients, error="Account not found")
-    if from_row["balance_cents"] < amount_cents:
+    problem = check_transfer(conn, from_id, to_id, amount_cents)
+    if problem:
         acc = conn.execute("SELECT id, account_number, name, balance_cents FROM accounts WHERE user_id = ?", (session["user_id"],)).fetchall()
         pay = conn.execute("""SELECT sp.payee_user_id, sp.label, u.username, u.full_name FROM saved_payees sp JOIN users u ON u.id = sp.payee_user_id WHERE sp.user_id = ? ORDER BY sp.label""", (session["user_id"],)).fetchall()
         r_rows = conn.execute("""SELECT a.id, a.account_number, a.name, a.balance_cents, u.full_name FROM accounts a JOIN users u ON u.id = a.user_id WHERE a.user_id != ? ORDER BY u.full_name, a.name""", (session["user_id"],)).fetchall()
-        recipients = [{"id": r["id"], "full_name": r["full_name"], "name": r["name"], "account_number": r["account_number"], "balance": f"{r['balance_cents'] / 100:.2f}"} for r in r_rows]
+        recipients = [{"id": r["id"], "full_name": r["full_name"], "name": r["name"], "account_number": r["account_number"], "balance": format_cents(r["balance_cents"])} for r in r_rows]
         conn.close()
-        return render_template("transfer.html", accounts=[row_to_account(r) for r in acc], saved_payees=[dict(r) for r in pay], recipient_accounts=recipients, error="Insufficient balance")
-    now = datetime.utcnow().isoformat() + "Z"
-    conn.execute("UPDATE accounts SET balance_cents = balance_cents - ? WHERE id = ?", (amount_cents, from_id))
-    conn.execute("UPDATE accounts SET balance_cents = balance_cents + ? WHERE id = ?", (amount_cents, to_id))
-    conn.execute(
-        "INSERT INTO transactions (from_account_id, to_account_id, amount_cents, memo, created_at) VALUES (?, ?, ?, ?, ?)",
-        (from_id, to_id, amount_cents, memo, now),
-    )
+        return render_template("transfer.html", accounts=[row_to_account(r) for r in acc], saved_payees=[dict(r) for r in pay], recipient_accounts=recipients, error=problem[0])
+    apply_transfer(conn, from_id, to_id, amount_cents, memo)
     conn.commit()
     conn.close()
     return redirect("/dashboard")
@@ -589,14 +1673,14 @@ def transfer_page():
 
 @app.route("/help")
 def help_page():
-    return render_template("help.html")
+    return render_static_page("help.html")
 
 
 @app.route("/")
 def index():
     if "user_id" in session:
         return redirect("/dashboard")
-    return render_template("login.html")
+    return render_static_page("login.html")
 
 
 @app.route("/api/health")
@@ -605,5 +1689,10 @@ def health():
 
 
 if __name__ == "__main__":
-    init_db()
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    use_reloader = os.environ.get("USE_RELOADER", "1") != "0"
+    # With the debug reloader the parent only watches files and the child serves,
+    # so only the serving process opens the database and runs the scheduler.
+    if not use_reloader or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        init_db()
+        scheduler.start()
+    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "5000")), debug=True, use_reloader=use_reloader)
@@ -0,0 +1,99 @@
+"""
+Serialization microbenchmark: sqlite3.Row + per-row dicts + jsonify (old)
+against tuple cursors + transactions_from_tuples + jsonify_rows (new).
+
+Checks that both produce the same bytes at every size before timing them.
+Run: python benchmarks/serialization.py [sizes...]   (default 100 10000 1000000)
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as bank  # noqa: E402
+from flask import jsonify  # noqa: E402
+
+QUERY = """SELECT t.id, t.from_account_id, t.to_account_id, t.amount_cents, t.memo, t.created_at,
+                  a_from.account_number AS from_num, a_to.account_number AS to_num
+           FROM transactions t
+           JOIN accounts a_from ON a_from.id = t.from_account_id
+           JOIN accounts a_to ON a_to.id = t.to_account_id
+           ORDER BY t.id LIMIT ?"""
+
+
+def old_row_to_transaction(r, from_number=None, to_number=None):
+    # row_to_transaction as it was before the tuple serialization path.
+    d = {
+        "id": r["id"],
+        "from_account_id": r["from_account_id"],
+        "to_account_id": r["to_account_id"],
+        "amount_cents": r["amount_cents"],
+        "amount": f"{r['amount_cents'] / 100:.2f}",
+        "memo": r["memo"] or "",
+        "created_at": r["created_at"],
+    }
+    if from_number:
+        d["from_account_number"] = from_number
+    if to_number:
+        d["to_account_number"] = to_number
+    return d
+
+
+def old_path(conn, n):
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(QUERY, (n,)).fetchall()
+    return jsonify([old_row_to_transaction(r, from_number=r["from_num"], to_number=r["to_num"]) for r in rows]).get_data()
+
+
+def new_path(conn, n):
+    return bank.jsonify_rows(bank.transactions_from_tuples(bank.fetch_tuples(conn, QUERY, (n,)))).get_data()
+
+
+def seed(n):
+    conn = bank.get_db()
+    conn.execute("DELETE FROM transactions")
+    conn.executemany(
+        "INSERT INTO transactions (from_account_id, to_account_id, amount_cents, memo, created_at) VALUES (?, ?, ?, ?, ?)",
+        (
+            (1 + i % 4, 1 + (i + 1) % 4, (i * 7919) % 10_000_000, None if i % 5 == 0 else f"memo {i}", f"2026-10-19T12:{i % 60:02d}:00.{i % 1_000_000:06d}Z")
+            for i in range(n)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def bench(fn, conn, n):
+    repeat = max(1, 100_000 // n)
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(conn, n)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [100, 10_000, 1_000_000]
+    print(f"fast encoder: {'orjson' if bank.load_orjson() else 'none (stdlib json)'}")
+    with tempfile.TemporaryDirectory() as tmp:
+        bank.DATABASE = os.path.join(tmp, "bench.db")
+        bank.init_db()
+        seed(max(sizes))
+        conn = sqlite3.connect(bank.DATABASE)
+        with bank.app.app_context():
+            for n in sizes:
+                if old_path(conn, n) != new_path(conn, n):
+                    sys.exit(f"FAIL: output differs at {n} rows")
+                old = bench(old_path, conn, n)
+                new = bench(new_path, conn, n)
+                print(f"{n:>9} rows  old {old * 1000:10.2f} ms  new {new * 1000:10.2f} ms  speedup {old / new:.2f}x")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
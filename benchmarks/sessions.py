@@ -0,0 +1,48 @@
+"""
+Session lookup benchmark: per-request cost of the server-side session
+interface (open_session + save_session) on an LRU hit and on a cache miss.
+Run: python benchmarks/sessions.py [iterations]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as bank  # noqa: E402
+from flask import request  # noqa: E402
+
+
+def per_request(n, before=None):
+    iface = bank.app.session_interface
+    response = bank.app.response_class()
+    start = time.perf_counter()
+    for _ in range(n):
+        if before:
+            before()
+        s = iface.open_session(bank.app, request)
+        iface.save_session(bank.app, s, response)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        bank.DATABASE = os.path.join(tmp, "bench.db")
+        bank.init_db()
+        client = bank.app.test_client()
+        client.post("/login", data={"username": "alice", "password": "alice123"})
+        sid = client.get_cookie(bank.app.config["SESSION_COOKIE_NAME"]).value
+        headers = {"Cookie": f"{bank.app.config['SESSION_COOKIE_NAME']}={sid}"}
+        with bank.app.test_request_context("/dashboard", headers=headers):
+            hit = per_request(n)
+            miss = per_request(max(1, n // 10), before=bank.session_store.cache.clear)
+        print(f"cache hit:  {hit:7.2f} us/request")
+        print(f"cache miss: {miss:7.2f} us/request")
+        if hit >= 50:
+            sys.exit("FAIL: cache-hit session lookup is over the 50 us budget")
+
+
+if __name__ == "__main__":
+    main()
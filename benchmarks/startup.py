@@ -0,0 +1,58 @@
+"""
+Startup benchmark: time from launching `python app.py` until /api/health first
+answers, with no database yet (cold) and with an existing one (warm).
+
+Each run uses a throwaway DATABASE_PATH and a free PORT.
+Run: python benchmarks/startup.py [runs]   (USE_RELOADER=0 to skip the debug reloader)
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_health(db_path, timeout=30):
+    port = free_port()
+    env = {**os.environ, "DATABASE_PATH": db_path, "PORT": str(port)}
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, APP], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("app did not answer /api/health")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    cold, warm = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(runs):
+            db_path = os.path.join(tmp, f"bank-{i}.db")
+            cold.append(time_to_health(db_path))
+            warm.append(time_to_health(db_path))
+    for label, samples in (("cold", cold), ("warm", warm)):
+        print(f"{label}: median {statistics.median(samples) * 1000:7.1f} ms  min {min(samples) * 1000:7.1f} ms  ({runs} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as bank  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A freshly seeded database in tmp_path; returns the app module."""
+    monkeypatch.setattr(bank, "DATABASE", str(tmp_path / "bank.db"))
+    monkeypatch.setattr(bank, "SEED_SNAPSHOT", str(tmp_path / "seed.db"))
+    monkeypatch.setattr(bank, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    bank.render_cache.clear()
+    bank.init_db()
+    return bank
+
+
+@pytest.fixture
+def client(db):
+    """Test client logged in as alice (user 1, account 1)."""
+    c = db.app.test_client()
+    assert c.post("/api/login", json={"username": "alice", "password": "alice123"}).status_code == 200
+    return c
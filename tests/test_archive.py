@@ -0,0 +1,141 @@
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+
+def insert(db, rows):
+    """rows of (from_account_id, to_account_id, amount_cents, memo, created_at)."""
+    conn = db.get_db()
+    conn.executemany(
+        "INSERT INTO transactions (from_account_id, to_account_id, amount_cents, memo, created_at) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def query(db, sql, params=()):
+    conn = db.get_db()
+    try:
+        return [tuple(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def archive_memos(db, month):
+    conn = sqlite3.connect(os.path.join(db.ARCHIVE_DIR, f"transactions-{month}.db"))
+    try:
+        return [m for (m,) in conn.execute("SELECT memo FROM transactions ORDER BY created_at")]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def history(db):
+    """60 transfers between charlie's accounts 3 and 4: 30 in Jan-Jun 2024 (archived), 30 hot in Dec 2024.
+
+    Returns the memos newest first.
+    """
+    rows = [(3, 4, i + 1, f"cold-{i:02d}", f"2024-{i // 5 + 1:02d}-{i % 5 + 10}T00:00:00Z") for i in range(30)]
+    rows += [(4, 3, i + 1, f"hot-{i:02d}", f"2024-12-10T00:{i:02d}:00Z") for i in range(30)]
+    insert(db, rows)
+    assert db.archive_transactions(30, now=datetime(2025, 1, 1)) == 30
+    return [memo for *_, memo, _ in sorted(rows, key=lambda r: r[4], reverse=True)]
+
+
+@pytest.fixture
+def charlie(db):
+    c = db.app.test_client()
+    assert c.post("/login", data={"username": "charlie", "password": "charlie789"}).status_code == 302
+    return c
+
+
+def test_archive_splits_december_and_january(db):
+    insert(db, [
+        (1, 2, 1, "dec", "2024-12-31T23:59:59Z"),
+        (2, 1, 2, "jan", "2025-01-01T00:00:00Z"),
+        (1, 2, 3, "feb", "2025-02-10T00:00:00Z"),
+    ])
+    assert db.archive_transactions(30, now=datetime(2025, 3, 1)) == 2
+    assert query(db, "SELECT month, filename, archived_through FROM transaction_archives ORDER BY month") == [
+        ("2024-12", "transactions-2024-12.db", "2025-01"),
+        ("2025-01", "transactions-2025-01.db", "2025-01-30T00:00:00Z"),
+    ]
+    assert archive_memos(db, "2024-12") == ["dec"]
+    assert archive_memos(db, "2025-01") == ["jan"]
+    assert query(db, "SELECT memo FROM transactions WHERE memo IN ('dec', 'jan', 'feb')") == [("feb",)]
+    assert query(db, "SELECT account_id, month FROM transaction_archive_accounts ORDER BY month, account_id") == [
+        (1, "2024-12"), (2, "2024-12"), (1, "2025-01"), (2, "2025-01"),
+    ]
+
+    assert db.archive_transactions(30, now=datetime(2025, 4, 1)) == 1
+    assert archive_memos(db, "2025-02") == ["feb"]
+    assert db.archive_transactions(30, now=datetime(2025, 4, 1)) == 0
+
+
+def test_history_spans_hot_and_cold_rows_in_order(db, history, charlie):
+    rows = charlie.get("/api/transactions?account_id=3").json
+    assert [r["memo"] for r in rows] == history[:50]
+    assert [r["memo"] for r in rows[29:31]] == ["hot-00", "cold-29"]
+
+
+def test_history_reads_every_archive_when_the_page_is_not_full(db, history, charlie):
+    conn = db.get_db()
+    conn.execute("DELETE FROM transactions WHERE memo LIKE 'hot-%'")
+    conn.commit()
+    conn.close()
+    rows = charlie.get("/api/transactions?account_id=4").json
+    assert [r["memo"] for r in rows] == history[30:]
+
+
+def test_transactions_page_lists_each_row_once_across_archives(db, history, charlie):
+    html = charlie.get("/transactions").get_data(as_text=True)
+    positions = [html.find(f"<td>{memo}</td>") for memo in history]
+    assert all(html.count(f"<td>{memo}</td>") == 1 for memo in history)
+    assert positions == sorted(positions)
+
+
+def test_accounts_without_archived_rows_attach_nothing(db, history):
+    attached = []
+    conn = db.get_db()
+    conn.set_trace_callback(lambda sql: attached.append(sql) if sql.startswith("ATTACH") else None)
+    rows = db.fetch_history(
+        conn,
+        "SELECT id FROM {transactions} WHERE from_account_id = ? OR to_account_id = ? ORDER BY created_at DESC LIMIT ?",
+        (1, 1),
+        50,
+        [1],
+    )
+    conn.close()
+    assert len(rows) == 2
+    assert attached == []
+
+
+def test_missing_and_unreadable_archives_are_skipped(db, history, charlie, caplog):
+    missing = os.path.join(db.ARCHIVE_DIR, "transactions-2024-06.db")
+    os.remove(missing)
+    with open(os.path.join(db.ARCHIVE_DIR, "transactions-2024-05.db"), "wb") as f:
+        f.write(b"not a database" * 100)
+
+    with caplog.at_level(logging.WARNING):
+        resp = charlie.get("/api/transactions?account_id=3")
+    assert resp.status_code == 200
+    skipped = {f"cold-{i:02d}" for i in range(20, 30)}
+    assert [r["memo"] for r in resp.json] == [m for m in history if m not in skipped][:50]
+    assert not os.path.exists(missing)
+    assert "transactions-2024-06.db" in caplog.text
+    assert "transactions-2024-05.db" in caplog.text
+
+
+def test_index_archive_accounts_backfills_existing_archives(db, history):
+    before = query(db, "SELECT account_id, month FROM transaction_archive_accounts ORDER BY month, account_id")
+    assert before == [(a, f"2024-{m:02d}") for m in range(1, 7) for a in (3, 4)]
+    conn = db.get_db()
+    conn.execute("DELETE FROM transaction_archive_accounts")
+    conn.commit()
+    db.index_archive_accounts(conn)
+    conn.close()
+    assert query(db, "SELECT account_id, month FROM transaction_archive_accounts ORDER BY month, account_id") == before
@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import pytest
+
+PAGES = ["/dashboard", "/transactions", "/accounts/1", "/accounts/2"]
+T = 1_800_000_000
+
+
+def render(client, paths=PAGES):
+    pages = {}
+    for path in paths:
+        resp = client.get(path)
+        assert resp.status_code == 200
+        pages[path] = resp.get_data(as_text=True)
+    return pages
+
+
+def assert_fresh(db, client, pages):
+    """Cached output must match what a cold cache renders."""
+    db.render_cache.clear()
+    assert render(client, list(pages)) == pages
+
+
+def execute(db, sql, params=()):
+    conn = db.get_db()
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def bob(db):
+    c = db.app.test_client()
+    assert c.post("/api/login", json={"username": "bob", "password": "bob456"}).status_code == 200
+    return c
+
+
+def test_fragments_are_served_from_cache(db, client):
+    first = render(client)
+    assert len(db.render_cache) >= len(PAGES)
+    assert render(client) == first
+
+
+def test_transfer_refreshes_both_users_fragments(db, client, bob):
+    before, bob_before = render(client), render(bob, ["/dashboard", "/transactions"])
+    resp = client.post("/transfer", data={"from_account_id": 1, "to_account_id": 2, "amount": "12.34", "memo": "Lunch"})
+    assert resp.status_code == 302
+
+    after, bob_after = render(client), render(bob, ["/dashboard", "/transactions"])
+    for path in PAGES:
+        assert after[path] != before[path], path
+    for path in bob_after:
+        assert bob_after[path] != bob_before[path], path
+    assert "1487.66" in after["/dashboard"]
+    assert "Lunch" in after["/transactions"] and "Lunch" in bob_after["/transactions"]
+    assert_fresh(db, client, after)
+
+
+def test_scheduled_transfer_refreshes_fragments(db, client):
+    resp = client.post("/api/scheduled-transfers", json={"from_account_id": 1, "to_account_id": 2, "amount_cents": 700, "memo": "Gym", "run_at": T})
+    assert resp.status_code == 200
+    before = render(client)
+    assert db.TransferScheduler(clock=lambda: T).run_due() == (1, 0)
+
+    after = render(client)
+    for path in PAGES:
+        assert after[path] != before[path], path
+    assert "Gym" in after["/transactions"]
+    assert_fresh(db, client, after)
+
+
+def test_archiving_keeps_fragments_current(db, client):
+    execute(db, "INSERT INTO transactions (from_account_id, to_account_id, amount_cents, memo, created_at) VALUES (1, 2, 5, 'Old', '2020-03-01T00:00:00Z')")
+    before = render(client)
+    assert "Old" in before["/transactions"]
+    assert db.archive_transactions(365, now=datetime(2026, 1, 1)) == 1
+
+    after = render(client)
+    assert "Old" in after["/transactions"] and "Old" in after["/accounts/1"]
+    assert_fresh(db, client, after)
+
+
+def test_deleting_a_transaction_refreshes_fragments(db, client):
+    before = render(client)
+    assert "Coffee" in before["/transactions"]
+    execute(db, "DELETE FROM transactions WHERE memo = 'Coffee'")
+
+    after = render(client)
+    for path in ("/transactions", "/accounts/1", "/accounts/2"):
+        assert "Coffee" not in after[path], path
+    assert_fresh(db, client, after)
+
+
+def test_adding_and_deleting_an_account_refreshes_dashboard(db, client):
+    execute(db, "INSERT INTO accounts (id, user_id, account_number, name, balance_cents) VALUES (9, 1, '400012340009', 'Holiday Fund', 4200)")
+    assert "Holiday Fund" in render(client, ["/dashboard"])["/dashboard"]
+    execute(db, "DELETE FROM accounts WHERE id = 9")
+    assert "Holiday Fund" not in render(client, ["/dashboard"])["/dashboard"]
+
+
+def test_static_pages_are_cached_per_login_state(db):
+    c = db.app.test_client()
+    anonymous = c.get("/help").get_data(as_text=True)
+    assert "logout" not in anonymous
+
+    c.post("/login", data={"username": "alice", "password": "alice123"})
+    logged_in = c.get("/help").get_data(as_text=True)
+    assert logged_in != anonymous
+    assert "logout" in logged_in
+
+    c.post("/logout")
+    assert c.get("/help").get_data(as_text=True) == anonymous
@@ -0,0 +1,228 @@
+import json
+import threading
+
+import pytest
+
+T = 1_800_000_000
+HOUR = 3600
+
+
+class Clock:
+    def __init__(self, now=T):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def scheduler(db, clock):
+    return db.TransferScheduler(clock=clock)
+
+
+def schedule(client, **fields):
+    body = {"from_account_id": 1, "to_account_id": 2, "amount_cents": 500, "run_at": T, **fields}
+    resp = client.post("/api/scheduled-transfers", data=json.dumps(body), content_type="application/json")
+    assert resp.status_code == 200, resp.json
+    return resp.json["id"]
+
+
+def balance(db, account_id):
+    conn = db.get_db()
+    try:
+        return conn.execute("SELECT balance_cents FROM accounts WHERE id = ?", (account_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def row(db, st_id):
+    conn = db.get_db()
+    try:
+        return dict(conn.execute("SELECT * FROM scheduled_transfers WHERE id = ?", (st_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def failures(db, st_id):
+    conn = db.get_db()
+    try:
+        return [
+            tuple(r)
+            for r in conn.execute(
+                "SELECT attempt, error, failed_at, retry_at FROM scheduled_transfer_failures WHERE scheduled_transfer_id = ? ORDER BY id",
+                (st_id,),
+            )
+        ]
+    finally:
+        conn.close()
+
+
+def count_transactions(db, memo):
+    conn = db.get_db()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM transactions WHERE memo = ?", (memo,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_one_off_transfer_runs_once_when_due(db, client, scheduler, clock):
+    st_id = schedule(client, memo="one-off")
+    clock.now = T - 1
+    assert scheduler.run_due() == (0, 0)
+
+    clock.now = T
+    assert scheduler.run_due() == (1, 0)
+    assert balance(db, 1) == 150000 - 500
+    assert balance(db, 2) == 75000 + 500
+    assert row(db, st_id)["status"] == "done"
+    assert count_transactions(db, "one-off") == 1
+
+    clock.now = T + HOUR
+    assert scheduler.run_due() == (0, 0)
+    assert count_transactions(db, "one-off") == 1
+
+
+def test_failing_transfer_backs_off_then_fails(db, client, scheduler, clock):
+    st_id = schedule(client, amount_cents=10**9)
+    assert scheduler.run_due() == (0, 1)
+    assert row(db, st_id)["next_run_at"] == T + 60
+
+    clock.now = T + 59
+    assert scheduler.run_due() == (0, 0)
+    clock.now = T + 60
+    assert scheduler.run_due() == (0, 1)
+    clock.now = T + 180
+    assert scheduler.run_due() == (0, 1)
+
+    r = row(db, st_id)
+    assert r["status"] == "failed"
+    assert r["last_error"] == "Insufficient balance"
+    assert failures(db, st_id) == [
+        (1, "Insufficient balance", T, T + 60),
+        (2, "Insufficient balance", T + 60, T + 180),
+        (3, "Insufficient balance", T + 180, None),
+    ]
+    assert balance(db, 1) == 150000
+
+    clock.now = T + 10 * HOUR
+    assert scheduler.run_due() == (0, 0)
+
+
+def test_recurring_transfer_advances_on_grid_and_skips_missed_slots(db, client, scheduler, clock):
+    st_id = schedule(client, interval_seconds=HOUR, memo="rent")
+    clock.now = T + 10
+    assert scheduler.run_due() == (1, 0)
+    assert row(db, st_id)["next_run_at"] == T + HOUR
+
+    # Down for three hours: one catch-up run, not three.
+    clock.now = T + 3 * HOUR + 5
+    assert scheduler.run_due() == (1, 0)
+    r = row(db, st_id)
+    assert (r["status"], r["due_at"], r["next_run_at"]) == ("active", T + 4 * HOUR, T + 4 * HOUR)
+    assert count_transactions(db, "rent") == 2
+
+
+def test_retry_does_not_shift_recurring_grid(db, client, scheduler, clock):
+    st_id = schedule(client, interval_seconds=HOUR, amount_cents=200000)
+    assert scheduler.run_due() == (0, 1)
+    r = row(db, st_id)
+    assert (r["due_at"], r["next_run_at"]) == (T, T + 60)
+
+    conn = db.get_db()
+    conn.execute("UPDATE accounts SET balance_cents = 10000000 WHERE id = 1")
+    conn.commit()
+    conn.close()
+    clock.now = T + 60
+    assert scheduler.run_due() == (1, 0)
+    r = row(db, st_id)
+    assert (r["due_at"], r["next_run_at"], r["attempts"]) == (T + HOUR, T + HOUR, 0)
+
+
+def test_recurring_transfer_gives_up_on_slot_after_max_attempts(db, client, scheduler, clock):
+    st_id = schedule(client, interval_seconds=HOUR, amount_cents=10**9)
+    for now in (T, T + 60, T + 180):
+        clock.now = now
+        assert scheduler.run_due() == (0, 1)
+    r = row(db, st_id)
+    assert (r["status"], r["attempts"], r["due_at"], r["next_run_at"]) == ("active", 0, T + HOUR, T + HOUR)
+    assert failures(db, st_id)[-1] == (3, "Insufficient balance", T + 180, T + HOUR)
+
+
+def test_bad_row_fails_alone_and_batch_commits(db, client, scheduler):
+    bad_id = schedule(client, memo="bad")
+    # Bypass API validation to get a row whose next slot overflows SQLite's integers.
+    conn = db.get_db()
+    conn.execute("UPDATE scheduled_transfers SET interval_seconds = ? WHERE id = ?", (2**63 - 10, bad_id))
+    conn.commit()
+    conn.close()
+    bob = db.app.test_client()
+    bob.post("/api/login", json={"username": "bob", "password": "bob456"})
+    good_id = schedule(bob, from_account_id=2, to_account_id=1, memo="good")
+
+    assert scheduler.run_due() == (1, 1)
+    assert row(db, good_id)["status"] == "done"
+    bad = row(db, bad_id)
+    assert bad["status"] == "failed"
+    assert bad["last_error"].startswith("OverflowError")
+    assert count_transactions(db, "bad") == 0
+    assert balance(db, 1) == 150000 + 500
+
+
+def test_loop_survives_a_failing_batch(db, clock, monkeypatch):
+    sched = db.TransferScheduler(clock=clock, poll_interval=0.01)
+    calls = []
+    second_call = threading.Event()
+
+    def run_due():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        second_call.set()
+        return 0, 0
+
+    monkeypatch.setattr(sched, "run_due", run_due)
+    sched.start()
+    try:
+        assert second_call.wait(5)
+        assert sched._thread.is_alive()
+    finally:
+        sched.stop()
+
+
+@pytest.mark.parametrize("interval", [2**63 - 10, 59, 366 * 86400 + 1, "3600", True, 1.5])
+def test_invalid_interval_rejected(client, interval):
+    body = {"from_account_id": 1, "to_account_id": 2, "amount_cents": 5, "interval_seconds": interval}
+    assert client.post("/api/scheduled-transfers", json=body).status_code == 400
+    st_id = schedule(client)
+    assert client.patch(f"/api/scheduled-transfers/{st_id}", json={"interval_seconds": interval}).status_code == 400
+
+
+@pytest.mark.parametrize("run_at", ["1e15", "NaN", "Infinity", "1e300", "-1", '"9999-01-01T00:00:00Z"', '"tomorrow"'])
+def test_invalid_run_at_rejected(client, run_at):
+    body = '{"from_account_id": 1, "to_account_id": 2, "amount_cents": 5, "run_at": %s}' % run_at
+    resp = client.post("/api/scheduled-transfers", data=body, content_type="application/json")
+    assert (resp.status_code, resp.json) == (400, {"error": "Invalid run_at"})
+    st_id = schedule(client)
+    resp = client.patch(f"/api/scheduled-transfers/{st_id}", data='{"run_at": %s}' % run_at, content_type="application/json")
+    assert (resp.status_code, resp.json) == (400, {"error": "Invalid run_at"})
+    assert client.get("/api/scheduled-transfers").status_code == 200
+
+
+@pytest.mark.parametrize("field", [{"amount_cents": 2**70}, {"amount_cents": 10**12 + 1}, {"amount_cents": 0}, {"memo": 123}, {"memo": ["x"]}])
+def test_invalid_amount_or_memo_rejected(client, field):
+    body = {"from_account_id": 1, "to_account_id": 2, "amount_cents": 5, **field}
+    assert client.post("/api/scheduled-transfers", json=body).status_code == 400
+    st_id = schedule(client)
+    assert client.patch(f"/api/scheduled-transfers/{st_id}", json=field).status_code == 400
+
+
+def test_memo_is_truncated_and_defaults_to_empty(db, client):
+    long_id = schedule(client, memo="x" * 600)
+    empty_id = schedule(client, memo=None)
+    assert row(db, long_id)["memo"] == "x" * 500
+    assert row(db, empty_id)["memo"] == ""
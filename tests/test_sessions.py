@@ -0,0 +1,151 @@
+import pytest
+
+T = 1_800_000_000
+
+
+class Clock:
+    def __init__(self, now=T):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def store(db, clock, monkeypatch):
+    """The app's session store, driven by clock."""
+    monkeypatch.setattr(db.session_store, "clock", clock)
+    monkeypatch.setattr(db.session_store, "_next_cleanup", 0)
+    db.session_store.cache.clear()
+    return db.session_store
+
+
+def login(db, username, password):
+    c = db.app.test_client()
+    assert c.post("/api/login", json={"username": username, "password": password}).status_code == 200
+    return c
+
+
+def sid_of(db, client):
+    cookie = client.get_cookie(db.app.config["SESSION_COOKIE_NAME"])
+    return cookie.value if cookie else None
+
+
+def logged_in(client):
+    return client.get("/api/accounts").status_code == 200
+
+
+def session_rows(db):
+    conn = db.get_db()
+    try:
+        return {sid: user_id for sid, user_id in conn.execute("SELECT id, user_id FROM sessions")}
+    finally:
+        conn.close()
+
+
+def test_cookie_holds_only_the_session_id(db, store):
+    alice = login(db, "alice", "alice123")
+    sid = sid_of(db, alice)
+    assert len(sid) == 43 and "alice" not in sid
+    assert session_rows(db) == {sid: 1}
+    data, expires_at = store.load(sid)
+    assert data["username"] == "alice"
+    assert expires_at == T + store.ttl
+
+
+def test_login_issues_a_new_session_id(db, store):
+    store.save("planted-id", {"next": "/dashboard"})
+    c = db.app.test_client()
+    c.set_cookie(db.app.config["SESSION_COOKIE_NAME"], "planted-id")
+    assert c.post("/api/login", json={"username": "alice", "password": "alice123"}).status_code == 200
+    alice_sid = sid_of(db, c)
+    assert alice_sid != "planted-id"
+    assert store.load("planted-id") is None
+
+    assert c.post("/api/login", json={"username": "bob", "password": "bob456"}).status_code == 200
+    assert sid_of(db, c) not in ("planted-id", alice_sid)
+    assert store.load(alice_sid) is None
+    assert session_rows(db) == {sid_of(db, c): 2}
+
+
+def test_logout_deletes_the_server_side_session(db, store):
+    alice = login(db, "alice", "alice123")
+    alice.post("/api/logout")
+    assert session_rows(db) == {}
+    assert not logged_in(alice)
+
+
+def test_session_expires_after_ttl(db, store, clock):
+    alice = login(db, "alice", "alice123")
+    clock.now = T + store.ttl // 2 - 1
+    assert logged_in(alice)
+    clock.now = T + store.ttl
+    assert not logged_in(alice)
+
+
+def test_active_session_is_extended(db, store, clock):
+    alice = login(db, "alice", "alice123")
+    clock.now = T + store.ttl // 2 + 1
+    assert logged_in(alice)
+    clock.now = T + store.ttl + 10
+    assert logged_in(alice)
+    # That request extended it again, to a full TTL from now.
+    clock.now += store.ttl
+    assert not logged_in(alice)
+
+
+def test_cleanup_expired_deletes_in_batches(db, store, clock, monkeypatch):
+    for i in range(25):
+        store.save(f"old-{i}", {"user_id": 1})
+    clock.now = T + store.ttl - 1
+    for i in range(5):
+        store.save(f"new-{i}", {"user_id": 2})
+
+    batches = []
+    fetch_tuples = db.fetch_tuples
+
+    def counting(conn, query, params=()):
+        if query.startswith("DELETE FROM sessions"):
+            batches.append(params)
+        return fetch_tuples(conn, query, params)
+
+    monkeypatch.setattr(db, "fetch_tuples", counting)
+    clock.now = T + store.ttl + 1
+    assert store.cleanup_expired(batch_size=10) == 25
+    assert len(batches) == 3
+    assert sorted(session_rows(db)) == [f"new-{i}" for i in range(5)]
+    assert store.cache.get("old-0") is None
+
+
+def test_revoke_user_logs_out_only_that_user(db, store):
+    alice, bob = login(db, "alice", "alice123"), login(db, "bob", "bob456")
+    assert store.revoke_user(1) == 1
+    assert not logged_in(alice)
+    assert logged_in(bob)
+
+
+@pytest.mark.parametrize("revoke", [lambda s: s.revoke_user(1), lambda s: s.revoke_all()])
+def test_revocation_by_another_process_applies_within_revalidate_window(db, store, clock, revoke):
+    alice = login(db, "alice", "alice123")
+    assert logged_in(alice)
+    other_process = db.SQLiteSessionStore(clock=clock)
+    assert revoke(other_process) == 1
+
+    clock.now = T + db.SESSION_CACHE_REVALIDATE_SECONDS - 1
+    assert logged_in(alice)
+    clock.now = T + db.SESSION_CACHE_REVALIDATE_SECONDS
+    assert not logged_in(alice)
+
+
+def test_revoke_sessions_command(db, store):
+    alice, bob = login(db, "alice", "alice123"), login(db, "bob", "bob456")
+    runner = db.app.test_cli_runner()
+    assert "Revoked 1 sessions for alice" in runner.invoke(args=["revoke-sessions", "--user", "alice"]).output
+    assert not logged_in(alice) and logged_in(bob)
+    assert "Revoked 1 sessions" in runner.invoke(args=["revoke-sessions"]).output
+    assert not logged_in(bob)